@@ -189,10 +189,12 @@ class MultiSourceExporter:
             if inv is None:
                 continue
 
-            vms_data  = [self._vm_to_row(vm)   for vm  in getattr(inv, 'virtual_machines', [])]
-            host_data = [self._host_to_row(h)   for h   in getattr(inv, 'hosts',            [])]
-            ds_data   = [self._ds_to_row(ds)    for ds  in getattr(inv, 'datastores',        [])]
-            net_data  = [self._net_to_row(n)    for n   in getattr(inv, 'networks',          [])]
+            # La fuente sale del perfil: no depende de que el escaneo etiquete cada registro
+            source = profile.display_name
+            vms_data  = [self._vm_to_row(vm, source)   for vm  in getattr(inv, 'virtual_machines', [])]
+            host_data = [self._host_to_row(h, source)   for h   in getattr(inv, 'hosts',            [])]
+            ds_data   = [self._ds_to_row(ds, source)    for ds  in getattr(inv, 'datastores',        [])]
+            net_data  = [self._net_to_row(n, source)    for n   in getattr(inv, 'networks',          [])]
 
             result[profile.id] = {
                 "vms":        self._make_df(vms_data,  VM_COLUMNS),
@@ -290,7 +292,7 @@ class MultiSourceExporter:
     # Conversores objeto → dict
     # ─────────────────────────────────────────────
 
-    def _vm_to_row(self, vm) -> dict:
+    def _vm_to_row(self, vm, source: str = "") -> dict:
         row = {}
 
         # ── Campos directos del modelo ────────────────────────────────────
@@ -315,6 +317,8 @@ class MultiSourceExporter:
         ]
         for label, attr in direct_fields:
             row[label] = getattr(vm, attr, "") or ""
+        if source:
+            row["Fuente"] = source
 
         # ── IP: primero desde NICs, luego campo directo ───────────────────
         nics = getattr(vm, 'nics', []) or []
@@ -358,7 +362,7 @@ class MultiSourceExporter:
 
         return row
 
-    def _host_to_row(self, host) -> dict:
+    def _host_to_row(self, host, source: str = "") -> dict:
         row = {}
 
         direct_fields = [
@@ -379,6 +383,8 @@ class MultiSourceExporter:
         ]
         for label, attr in direct_fields:
             row[label] = getattr(host, attr, "") or ""
+        if source:
+            row["Fuente"] = source
 
         # ── RAM ───────────────────────────────────────────────────────────
         ram_total = getattr(host, 'ram_total_gb', 0.0) or 0.0
@@ -393,7 +399,7 @@ class MultiSourceExporter:
 
         return row
 
-    def _ds_to_row(self, ds) -> dict:
+    def _ds_to_row(self, ds, source: str = "") -> dict:
         row = {}
 
         direct_fields = [
@@ -407,6 +413,8 @@ class MultiSourceExporter:
             if isinstance(val, bool):
                 val = "Sí" if val else "No"
             row[label] = val or ""
+        if source:
+            row["Fuente"] = source
 
         cap  = getattr(ds, 'capacity_gb', 0.0) or 0.0
         free = getattr(ds, 'free_gb',     0.0) or 0.0
@@ -423,7 +431,7 @@ class MultiSourceExporter:
 
         return row
 
-    def _net_to_row(self, net) -> dict:
+    def _net_to_row(self, net, source: str = "") -> dict:
         row = {}
 
         direct_fields = [
@@ -436,6 +444,8 @@ class MultiSourceExporter:
         ]
         for label, attr in direct_fields:
             row[label] = getattr(net, attr, "") or ""
+        if source:
+            row["Fuente"] = source
 
         hosts = getattr(net, 'hosts', []) or []
         row["Hosts"] = " | ".join(hosts) if hosts else ""
@@ -7,6 +7,9 @@ from enum import Enum
 import uuid
 
 
+# Largo del error que se muestra en la tabla de conexiones
+ERROR_SHORT_LEN = 60
+
 def _short_uuid() -> str:
     """Genera un ID corto de 8 caracteres. Wrapper nombrado para evitar lambda."""
     return str(uuid.uuid4())[:8]
@@ -15,6 +18,10 @@ class ConnectionType(Enum):
     VCENTER = "vCenter"
     ESXI = "ESXi Host"
 
+    def __init__(self, value: str):
+        # Forma que espera VMwareService.connect; se calcula una vez por miembro
+        self.service_type = value.lower()
+
 class ConnectionStatus(Enum):
     PENDING   = "Pendiente"
     TESTING   = "Probando..."
@@ -46,6 +53,10 @@ class ConnectionProfile:
     hosts_found: int = 0
     datastores_found: int = 0
 
+    # Cache de error_short: último error_message visto y su versión recortada
+    _error_src: str = field(default="", init=False, repr=False, compare=False)
+    _error_short: str = field(default="", init=False, repr=False, compare=False)
+
     def __post_init__(self):
         if not self.alias:
             self.alias = self.host
@@ -54,6 +65,15 @@ class ConnectionProfile:
     def display_name(self) -> str:
         return f"[{self.connection_type.value}] {self.alias}"
 
+    @property
+    def error_short(self) -> str:
+        """error_message recortado para la UI; se recorta solo cuando cambia."""
+        msg = self.error_message
+        if msg is not self._error_src:
+            self._error_src = msg
+            self._error_short = msg[:ERROR_SHORT_LEN]
+        return self._error_short
+
     @property
     def is_ready(self) -> bool:
         return self.status == ConnectionStatus.OK
@@ -108,6 +128,7 @@ class ScanConfig:
     include_hosts: bool = True
     include_datastores: bool = True
     include_networks: bool = True
+    tag_source: bool = False             # Asignar source_name en cada registro del inventario
 
     @property
     def mode_label(self) -> str:
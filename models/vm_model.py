@@ -1,25 +1,66 @@
 """
 Modelos de datos: VMModel, HostModel, DatastoreModel, NetworkModel
 """
-from dataclasses import dataclass, field
-from typing import List
+import operator
+from dataclasses import dataclass
+from typing import Sequence
 
-@dataclass
+# Separador de listas en las columnas de texto de to_dict
+_SEP = " | "
+
+# Los campos de colección usan () por defecto: una VM sin discos/NICs no
+# reserva listas vacías. Quien los rellena asigna una lista nueva completa.
+
+
+def _to_row(self) -> dict:
+    """Fila con las columnas directas (sin las calculadas de to_dict)."""
+    return dict(zip(self._row_keys, self._row_getter(self)))
+
+def _with_fast_to_dict(cls):
+    """
+    Genera cls._fields_dict a partir de _TO_DICT_FIELDS: una única expresión
+    {...} con cada self.<atributo> inline, compilada una vez por clase.
+    Las columnas calculadas quedan en None para que to_dict las complete.
+
+    Además expone _row_keys/_row_getter (operator.attrgetter sobre las
+    columnas directas) y to_row(), para volcados masivos tipo
+    pd.DataFrame([m._row_getter(m) for m in models], columns=cls._row_keys).
+    """
+    items = ", ".join(
+        f"{key!r}: self.{attr}" if attr else f"{key!r}: None"
+        for key, attr in cls._TO_DICT_FIELDS
+    )
+    source = f"def _fields_dict(self):\n    return {{{items}}}\n"
+    namespace = {}
+    # El código se arma solo con _TO_DICT_FIELDS (constantes de clase), nunca con datos externos
+    exec(compile(source, f"<{cls.__name__}._fields_dict>", "exec"), {}, namespace)  # nosec B102
+    fn = namespace["_fields_dict"]
+    fn.__qualname__ = f"{cls.__name__}._fields_dict"
+    cls._fields_dict = fn
+
+    direct = [(key, attr) for key, attr in cls._TO_DICT_FIELDS if attr]
+    cls._row_keys = tuple(key for key, _ in direct)
+    cls._row_getter = operator.attrgetter(*(attr for _, attr in direct))
+    cls.to_row = _to_row
+    return cls
+
+@dataclass(slots=True)
 class NicInfo:
     label: str = ""
     mac_address: str = ""
     network: str = ""
-    ip_addresses: List[str] = field(default_factory=list)
+    ip_addresses: Sequence[str] = ()
     connected: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class DiskInfo:
     label: str = ""
     size_gb: float = 0.0
     datastore: str = ""
     thin_provisioned: bool = False
 
-@dataclass
+@_with_fast_to_dict
+@dataclass(slots=True)
 class VMModel:
     vcenter: str = ""
     host: str = ""
@@ -31,8 +72,7 @@ class VMModel:
     processor: str = ""
     vcpu: int = 0
     ram_mb: int = 0
-    ram_gb: float = 0.0
-    disks: List[DiskInfo] = field(default_factory=list)
+    disks: Sequence[DiskInfo] = ()
     domain: str = ""
     os_name: str = ""
     os_edition: str = ""
@@ -42,50 +82,67 @@ class VMModel:
     tools_status: str = ""
     tools_version: str = ""
     hw_version: str = ""
-    nics: List[NicInfo] = field(default_factory=list)
+    nics: Sequence[NicInfo] = ()
+    source_name: str = ""                    # Fuente; la asigna ConnectionManager._tag_inventory
+
+    # (columna, atributo) en orden de salida; None = columna calculada en to_dict
+    _TO_DICT_FIELDS = (
+        ("vCenter",              "vcenter"),
+        ("Host",                 "host"),
+        ("Ambiente",             "environment"),
+        ("Hostname",             "hostname"),
+        ("Descripcion",          "description"),
+        ("Direccion IP",         None),
+        ("MAC",                  None),
+        ("Procesador",           "processor"),
+        ("vCPU",                 "vcpu"),
+        ("RAM (GB)",             "ram_gb"),
+        ("Discos Configurados",  None),
+        ("Cantidad Discos",      None),
+        ("Storage Total (GB)",   None),
+        ("Dominio",              "domain"),
+        ("Sistema Operativo",    "os_name"),
+        ("Edicion SO",           "os_edition"),
+        ("Estado",               "power_state"),
+        ("Datastore Principal",  None),
+        ("Red Principal",        None),
+        ("NICs Detalle",         None),
+        ("VMware Tools Status",  "tools_status"),
+        ("VMware Tools Version", "tools_version"),
+        ("Version HW",           "hw_version"),
+    )
+
+    @property
+    def ram_gb(self) -> float:
+        """RAM en GB derivada de ram_mb (única fuente de verdad)."""
+        return round(self.ram_mb / 1024, 2) if self.ram_mb else 0.0
 
     def to_dict(self) -> dict:
-        disks_str = " | ".join(
-            [f"{d.label}: {d.size_gb:.0f}GB ({d.datastore})" for d in self.disks]
-        ) if self.disks else ""
-        nics_str = " | ".join(
-            [f"{n.label}: {n.mac_address} [{', '.join(n.ip_addresses)}]" for n in self.nics]
-        ) if self.nics else ""
-        first_ip = ""
-        for nic in self.nics:
-            if nic.ip_addresses:
-                first_ip = nic.ip_addresses[0]
-                break
-        first_mac = self.nics[0].mac_address if self.nics else ""
-        first_net = self.nics[0].network if self.nics else ""
-        first_ds = self.disks[0].datastore if self.disks else self.datastore
-        return {
-            "vCenter": self.vcenter,
-            "Host": self.host,
-            "Ambiente": self.environment,
-            "Hostname": self.hostname,
-            "Descripcion": self.description,
-            "Direccion IP": first_ip or self.ip_address,
-            "MAC": first_mac or self.mac_address,
-            "Procesador": self.processor,
-            "vCPU": self.vcpu,
-            "RAM (GB)": round(self.ram_mb / 1024, 2) if self.ram_mb else self.ram_gb,
-            "Discos Configurados": disks_str,
-            "Cantidad Discos": len(self.disks),
-            "Storage Total (GB)": round(sum(d.size_gb for d in self.disks), 2),
-            "Dominio": self.domain,
-            "Sistema Operativo": self.os_name,
-            "Edicion SO": self.os_edition,
-            "Estado": self.power_state,
-            "Datastore Principal": first_ds,
-            "Red Principal": first_net or self.network,
-            "NICs Detalle": nics_str,
-            "VMware Tools Status": self.tools_status,
-            "VMware Tools Version": self.tools_version,
-            "Version HW": self.hw_version,
-        }
-
-@dataclass
+        row = self._fields_dict()
+        disks_str = _SEP.join(
+            f"{d.label}: {d.size_gb:.0f}GB ({d.datastore})" for d in self.disks
+        )
+        nics = self.nics
+        nics_str = _SEP.join(
+            f"{n.label}: {n.mac_address} [{', '.join(n.ip_addresses)}]" for n in nics
+        )
+        n0 = nics[0] if nics else None
+        first_ip = next((ip for nic in nics for ip in nic.ip_addresses), "")
+        first_mac = n0.mac_address if n0 else ""
+        first_net = n0.network if n0 else ""
+        # Las columnas calculadas ya existen en row: reasignarlas conserva el orden
+        row["Direccion IP"] = first_ip or self.ip_address
+        row["MAC"] = first_mac or self.mac_address
+        row["Discos Configurados"] = disks_str
+        row["Cantidad Discos"] = len(self.disks)
+        row["Storage Total (GB)"] = round(sum(d.size_gb for d in self.disks), 2)
+        row["Datastore Principal"] = self.disks[0].datastore if self.disks else self.datastore
+        row["Red Principal"] = first_net or self.network
+        row["NICs Detalle"] = nics_str
+        return row
+
+@_with_fast_to_dict
+@dataclass(slots=True)
 class HostModel:
     vcenter: str = ""
     name: str = ""
@@ -97,72 +154,97 @@ class HostModel:
     cpu_threads: int = 0
     ram_total_gb: float = 0.0
     ram_used_gb: float = 0.0
-    datastores: List[str] = field(default_factory=list)
+    datastores: Sequence[str] = ()
     state: str = ""
     cluster: str = ""
     vendor: str = ""
     model: str = ""
     serial_number: str = ""
+    source_name: str = ""                    # Fuente; la asigna ConnectionManager._tag_inventory
+
+    _TO_DICT_FIELDS = (
+        ("vCenter",        "vcenter"),
+        ("Nombre Host",    "name"),
+        ("IP",             "ip_address"),
+        ("Version ESXi",   "esxi_version"),
+        ("Build",          "build"),
+        ("Modelo CPU",     "cpu_model"),
+        ("Cores CPU",      "cpu_cores"),
+        ("Threads CPU",    "cpu_threads"),
+        ("RAM Total (GB)", None),
+        ("RAM Usada (GB)", None),
+        ("RAM Libre (GB)", None),
+        ("Datastores",     None),
+        ("Estado",         "state"),
+        ("Cluster",        "cluster"),
+        ("Fabricante",     "vendor"),
+        ("Modelo",         "model"),
+        ("Numero Serie",   "serial_number"),
+    )
 
     def to_dict(self) -> dict:
-        return {
-            "vCenter": self.vcenter,
-            "Nombre Host": self.name,
-            "IP": self.ip_address,
-            "Version ESXi": self.esxi_version,
-            "Build": self.build,
-            "Modelo CPU": self.cpu_model,
-            "Cores CPU": self.cpu_cores,
-            "Threads CPU": self.cpu_threads,
-            "RAM Total (GB)": round(self.ram_total_gb, 2),
-            "RAM Usada (GB)": round(self.ram_used_gb, 2),
-            "RAM Libre (GB)": round(self.ram_total_gb - self.ram_used_gb, 2),
-            "Datastores": " | ".join(self.datastores),
-            "Estado": self.state,
-            "Cluster": self.cluster,
-            "Fabricante": self.vendor,
-            "Modelo": self.model,
-            "Numero Serie": self.serial_number,
-        }
-
-@dataclass
+        row = self._fields_dict()
+        row["RAM Total (GB)"] = round(self.ram_total_gb, 2)
+        row["RAM Usada (GB)"] = round(self.ram_used_gb, 2)
+        row["RAM Libre (GB)"] = round(self.ram_total_gb - self.ram_used_gb, 2)
+        row["Datastores"] = _SEP.join(self.datastores)
+        return row
+
+@_with_fast_to_dict
+@dataclass(slots=True)
 class DatastoreModel:
     name: str = ""
     ds_type: str = ""
     capacity_gb: float = 0.0
     free_gb: float = 0.0
     used_gb: float = 0.0
-    hosts: List[str] = field(default_factory=list)
+    hosts: Sequence[str] = ()
     accessible: bool = True
+    source_name: str = ""                    # Fuente; la asigna ConnectionManager._tag_inventory
+
+    _TO_DICT_FIELDS = (
+        ("Nombre",               "name"),
+        ("Tipo",                 "ds_type"),
+        ("Capacidad Total (GB)", None),
+        ("Espacio Libre (GB)",   None),
+        ("Espacio Usado (GB)",   None),
+        ("% Usado",              None),
+        ("Hosts Asociados",      None),
+        ("Accesible",            None),
+    )
 
     def to_dict(self) -> dict:
+        row = self._fields_dict()
         pct = (self.used_gb / self.capacity_gb * 100) if self.capacity_gb > 0 else 0
-        return {
-            "Nombre": self.name,
-            "Tipo": self.ds_type,
-            "Capacidad Total (GB)": round(self.capacity_gb, 2),
-            "Espacio Libre (GB)": round(self.free_gb, 2),
-            "Espacio Usado (GB)": round(self.used_gb, 2),
-            "% Usado": round(pct, 1),
-            "Hosts Asociados": " | ".join(self.hosts),
-            "Accesible": "Si" if self.accessible else "No",
-        }
-
-@dataclass
+        row["Capacidad Total (GB)"] = round(self.capacity_gb, 2)
+        row["Espacio Libre (GB)"] = round(self.free_gb, 2)
+        row["Espacio Usado (GB)"] = round(self.used_gb, 2)
+        row["% Usado"] = round(pct, 1)
+        row["Hosts Asociados"] = _SEP.join(self.hosts)
+        row["Accesible"] = "Si" if self.accessible else "No"
+        return row
+
+@_with_fast_to_dict
+@dataclass(slots=True)
 class NetworkModel:
     name: str = ""
     net_type: str = ""
     vlan_id: str = ""
-    hosts: List[str] = field(default_factory=list)
+    hosts: Sequence[str] = ()
     switch_name: str = ""
     vms_count: int = 0
+    source_name: str = ""                    # Fuente; la asigna ConnectionManager._tag_inventory
+
+    _TO_DICT_FIELDS = (
+        ("Nombre",          "name"),
+        ("Tipo",            "net_type"),
+        ("VLAN",            "vlan_id"),
+        ("Hosts",           None),
+        ("Switch Asociado", "switch_name"),
+        ("VMs Conectadas",  "vms_count"),
+    )
 
     def to_dict(self) -> dict:
-        return {
-            "Nombre": self.name,
-            "Tipo": self.net_type,
-            "VLAN": self.vlan_id,
-            "Hosts": " | ".join(self.hosts),
-            "Switch Asociado": self.switch_name,
-            "VMs Conectadas": self.vms_count,
-        }
+        row = self._fields_dict()
+        row["Hosts"] = _SEP.join(self.hosts)
+        return row
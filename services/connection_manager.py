@@ -2,11 +2,12 @@
 services/connection_manager.py
 Orquestador de múltiples conexiones VMware con soporte paralelo/secuencial.
 """
+import asyncio
 import threading
 import queue
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Callable, Optional, Dict
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import List, Callable, Optional, Dict, Tuple
 from dataclasses import dataclass, field
 
 from models.connection_profile import ConnectionProfile, ConnectionStatus, ScanConfig
@@ -14,6 +15,59 @@ from services.vmware_service import VMwareService, VMwareConnectionError
 
 logger = logging.getLogger(__name__)
 
+_BAR = "=" * 50
+
+# Categorías de inventario: (atributo de SimpleInventory, método de
+# VMwareService, flag de ScanConfig que la habilita)
+_CATEGORIES = (
+    ("virtual_machines", "extract_vms",        "include_vms"),
+    ("hosts",            "extract_hosts",      "include_hosts"),
+    ("datastores",       "extract_datastores", "include_datastores"),
+    ("networks",         "extract_networks",   "include_networks"),
+)
+
+# Plantillas de mensajes de progreso; ScanProgress.message las formatea bajo demanda
+_MSG_CONNECTING = "Conectando a {name}..."
+_MSG_QUEUED     = "Encolando {name}..."
+_MSG_OK_FULL    = "✅ {name} — {vms} VMs, {hosts} Hosts"
+_MSG_OK_SHORT   = "✅ {name} — {vms} VMs"
+_MSG_ERR        = "❌ {name} — {error}"
+
+
+@dataclass
+class VMColumns:
+    """
+    Vista columnar (SoA) de las VMs de una fuente: una lista por campo,
+    todas alineadas por índice. Permite volcar o agregar una columna
+    completa (DataFrame, escritura por columnas) sin recorrer los objetos.
+    """
+    source_name: list = field(default_factory=list)
+    vcenter:     list = field(default_factory=list)
+    host:        list = field(default_factory=list)
+    hostname:    list = field(default_factory=list)
+    ip_address:  list = field(default_factory=list)
+    power_state: list = field(default_factory=list)
+    os_name:     list = field(default_factory=list)
+    vcpu:        list = field(default_factory=list)
+    ram_mb:      list = field(default_factory=list)
+
+    @classmethod
+    def from_vms(cls, vms: list, source: str) -> "VMColumns":
+        return cls(
+            source_name=[source] * len(vms),
+            vcenter=[vm.vcenter for vm in vms],
+            host=[vm.host for vm in vms],
+            hostname=[vm.hostname for vm in vms],
+            ip_address=[vm.ip_address for vm in vms],
+            power_state=[vm.power_state for vm in vms],
+            os_name=[vm.os_name for vm in vms],
+            vcpu=[vm.vcpu for vm in vms],
+            ram_mb=[vm.ram_mb for vm in vms],
+        )
+
+    def __len__(self) -> int:
+        return len(self.hostname)
+
 
 @dataclass
 class SimpleInventory:
@@ -25,6 +79,15 @@ class SimpleInventory:
     hosts:            list = field(default_factory=list)
     datastores:       list = field(default_factory=list)
     networks:         list = field(default_factory=list)
+    source:           str = ""                      # display_name de la fuente
+    _vm_columns:      Optional[VMColumns] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def vm_columns(self) -> VMColumns:
+        """Vista columnar de virtual_machines; se construye en el primer acceso."""
+        if self._vm_columns is None:
+            self._vm_columns = VMColumns.from_vms(self.virtual_machines, self.source)
+        return self._vm_columns
 
 
 @dataclass
@@ -33,12 +96,22 @@ class ScanProgress:
     profile_id: str
     profile_name: str
     status: ConnectionStatus
-    message: str
+    template: str                      # Una de las plantillas _MSG_*
     progress_pct: float = 0.0          # 0-100 global
     vms_found: int = 0
     hosts_found: int = 0
     error: str = ""
 
+    @property
+    def message(self) -> str:
+        """Texto del evento; solo se construye si algún listener lo lee."""
+        return self.template.format(
+            name=self.profile_name,
+            vms=self.vms_found,
+            hosts=self.hosts_found,
+            error=self.error,
+        )
+
 
 @dataclass
 class ConsolidatedResult:
@@ -51,48 +124,51 @@ class ConsolidatedResult:
     # Perfiles procesados (éxito y error)
     completed_profiles: List[ConnectionProfile] = field(default_factory=list)
     failed_profiles: List[ConnectionProfile] = field(default_factory=list)
+    # Totales acumulados en add_source (evita recorrer results_by_source)
+    _total_vms:        int = field(default=0, init=False, repr=False)
+    _total_hosts:      int = field(default=0, init=False, repr=False)
+    _total_datastores: int = field(default=0, init=False, repr=False)
+
+    def add_source(self, profile: ConnectionProfile, inventory: SimpleInventory):
+        """Registra el inventario de un perfil exitoso y actualiza los totales."""
+        self.results_by_source[profile.id] = inventory
+        self.completed_profiles.append(profile)
+        self._total_vms        += len(inventory.virtual_machines)
+        self._total_hosts      += len(inventory.hosts)
+        self._total_datastores += len(inventory.datastores)
+
+    def add_failure(self, profile: ConnectionProfile):
+        """Registra un perfil fallido u omitido."""
+        self.failed_profiles.append(profile)
 
     @property
     def total_vms(self) -> int:
-        return sum(
-            len(r.virtual_machines)
-            for r in self.results_by_source.values()
-            if r and hasattr(r, 'virtual_machines')
-        )
+        return self._total_vms
 
     @property
     def total_hosts(self) -> int:
-        return sum(
-            len(r.hosts)
-            for r in self.results_by_source.values()
-            if r and hasattr(r, 'hosts')
-        )
+        return self._total_hosts
 
     @property
     def total_datastores(self) -> int:
-        return sum(
-            len(r.datastores)
-            for r in self.results_by_source.values()
-            if r and hasattr(r, 'datastores')
-        )
+        return self._total_datastores
 
     @property
     def has_data(self) -> bool:
         return bool(self.results_by_source)
 
-    def summary_lines(self) -> List[str]:
-        lines = [
-            f"{'='*50}",
-            f"  RESUMEN DE ESCANEO CONSOLIDADO",
-            f"{'='*50}",
+    def summary_lines(self) -> Tuple[str, ...]:
+        return (
+            _BAR,
+            "  RESUMEN DE ESCANEO CONSOLIDADO",
+            _BAR,
             f"  Fuentes exitosas : {len(self.completed_profiles)}",
             f"  Fuentes con error: {len(self.failed_profiles)}",
             f"  Total VMs        : {self.total_vms}",
             f"  Total Hosts      : {self.total_hosts}",
             f"  Total Datastores : {self.total_datastores}",
-            f"{'='*50}",
-        ]
-        return lines
+            _BAR,
+        )
 
 
 class ConnectionManager:
@@ -103,9 +179,11 @@ class ConnectionManager:
 
     def __init__(self):
         self.profiles: List[ConnectionProfile] = []
+        self._by_id: Dict[str, ConnectionProfile] = {}    # Índice id → perfil
         self._lock = threading.Lock()
         self._stop_event = threading.Event()
         self._progress_queue: queue.Queue = queue.Queue()
+        self._on_progress: Optional[Callable[[ScanProgress], None]] = None
 
     # ─────────────────────────────────────────────
     # Gestión de perfiles
@@ -114,18 +192,21 @@ class ConnectionManager:
     def add_profile(self, profile: ConnectionProfile):
         with self._lock:
             self.profiles.append(profile)
+            self._by_id[profile.id] = profile
         logger.info(f"Perfil agregado: {profile.display_name}")
 
     def remove_profile(self, profile_id: str):
         with self._lock:
             self.profiles = [p for p in self.profiles if p.id != profile_id]
+            self._by_id.pop(profile_id, None)
 
     def get_profile(self, profile_id: str) -> Optional[ConnectionProfile]:
-        return next((p for p in self.profiles if p.id == profile_id), None)
+        return self._by_id.get(profile_id)
 
     def clear_profiles(self):
         with self._lock:
             self.profiles.clear()
+            self._by_id.clear()
 
     def reset_all_statuses(self):
         for p in self.profiles:
@@ -148,7 +229,7 @@ class ConnectionManager:
                 password=profile.password,
                 port=profile.port,
                 ignore_ssl=profile.ignore_ssl,
-                connection_type=profile.connection_type.value.lower(),
+                connection_type=profile.connection_type.service_type,
             )
             svc.disconnect()
             profile.status = ConnectionStatus.OK
@@ -175,13 +256,17 @@ class ConnectionManager:
     ):
         """
         Lanza el escaneo en un hilo separado para no bloquear la UI.
+        Los eventos de progreso se encolan; la UI debe llamar periódicamente
+        a drain_progress() desde su propio hilo para recibirlos en on_progress.
         """
         self._stop_event.clear()
+        self._progress_queue = queue.Queue()
+        self._on_progress = on_progress
         targets = profiles_override or self.profiles
 
         thread = threading.Thread(
             target=self._run_scan,
-            args=(targets, config, on_progress, on_complete),
+            args=(targets, config, on_complete),
             daemon=True,
             name="ScanOrchestrator"
         )
@@ -191,23 +276,39 @@ class ConnectionManager:
     def stop_scan(self):
         self._stop_event.set()
 
+    def drain_progress(self, max_items: int = 32) -> int:
+        """
+        Entrega a on_progress hasta max_items eventos pendientes.
+        Pensado para llamarse desde el hilo de UI (after/QTimer).
+        Retorna cuántos eventos se entregaron.
+        """
+        delivered = 0
+        while delivered < max_items:
+            try:
+                prog = self._progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if self._on_progress:
+                self._on_progress(prog)
+            delivered += 1
+        return delivered
+
     def _run_scan(
         self,
         profiles: List[ConnectionProfile],
         config: ScanConfig,
-        on_progress: Callable,
         on_complete: Callable,
     ):
         """Lógica principal de orquestación (corre en hilo separado)."""
         result = ConsolidatedResult()
         total = len(profiles)
 
-        def emit(profile: ConnectionProfile, msg: str, pct: float, vms=0, hosts=0, error=""):
-            on_progress(ScanProgress(
+        def emit(profile: ConnectionProfile, template: str, pct: float, vms=0, hosts=0, error=""):
+            self._progress_queue.put_nowait(ScanProgress(
                 profile_id=profile.id,
                 profile_name=profile.display_name,
                 status=profile.status,
-                message=msg,
+                template=template,
                 progress_pct=pct,
                 vms_found=vms,
                 hosts_found=hosts,
@@ -225,18 +326,35 @@ class ConnectionManager:
         self,
         profile: ConnectionProfile,
         config: ScanConfig,
+        on_start: Optional[Callable[[ConnectionProfile], None]] = None,
     ):
         """
         Escanea un único perfil usando los métodos individuales de VMwareService.
         Retorna un SimpleInventory (objeto con atributos virtual_machines, hosts,
         datastores, networks) o None si falla.
+        on_start se invoca cuando el perfil pasa a SCANNING (modo paralelo).
         """
         if self._stop_event.is_set():
             profile.status = ConnectionStatus.SKIPPED
             return None
 
+        enabled = [
+            (name, method) for name, method, flag in _CATEGORIES
+            if getattr(config, flag)
+        ]
+        if not enabled:
+            # Nada que extraer: evitar el connect/disconnect contra el servidor
+            profile.status           = ConnectionStatus.DONE
+            profile.vms_found        = 0
+            profile.hosts_found      = 0
+            profile.datastores_found = 0
+            return SimpleInventory(source=profile.display_name)
+
+        svc = None
         try:
             profile.status = ConnectionStatus.SCANNING
+            if on_start is not None:
+                on_start(profile)
             svc = VMwareService()
             svc.connect(
                 host=profile.host,
@@ -244,23 +362,15 @@ class ConnectionManager:
                 password=profile.password,
                 port=profile.port,
                 ignore_ssl=profile.ignore_ssl,
-                connection_type=profile.connection_type.value.lower(),
+                connection_type=profile.connection_type.service_type,
             )
 
-            # Extraer cada categoría usando los métodos reales del servicio
-            vms        = svc.extract_vms()        if config.include_vms        else []
-            hosts      = svc.extract_hosts()      if config.include_hosts      else []
-            datastores = svc.extract_datastores() if config.include_datastores else []
-            networks   = svc.extract_networks()   if config.include_networks   else []
-
-            svc.disconnect()
+            extracted = self._extract_all(svc, enabled)
 
             # Empaquetar en objeto simple compatible con ConsolidatedResult
             inventory = SimpleInventory(
-                virtual_machines=vms or [],
-                hosts=hosts or [],
-                datastores=datastores or [],
-                networks=networks or [],
+                source=profile.display_name,
+                **{name: extracted.get(name) or [] for name, _, _ in _CATEGORIES}
             )
 
             profile.status          = ConnectionStatus.DONE
@@ -268,8 +378,10 @@ class ConnectionManager:
             profile.hosts_found     = len(inventory.hosts)
             profile.datastores_found = len(inventory.datastores)
 
-            # Inyectar campo "fuente" en cada registro
-            self._tag_inventory(inventory, profile)
+            # Inyectar campo "fuente" en cada registro (opcional: el exportador
+            # ya agrupa por profile.id y toma la fuente del perfil)
+            if config.tag_source:
+                self._tag_inventory(inventory, profile)
 
             return inventory
 
@@ -283,6 +395,34 @@ class ConnectionManager:
             profile.error_message = str(e)
             logger.error(f"Error inesperado en {profile.display_name}: {e}", exc_info=True)
             return None
+        finally:
+            # La sesión se cierra en todos los caminos, también tras un fallo
+            if svc is not None:
+                svc.disconnect()
+
+    @staticmethod
+    def _extract_all(svc: VMwareService, enabled: List[Tuple[str, str]]) -> Dict[str, list]:
+        """
+        Extrae las categorías habilitadas en paralelo sobre la misma sesión:
+        el stub SOAP de pyVmomi reparte las llamadas concurrentes en su pool
+        de conexiones y cada extract_* crea su propia ContainerView.
+        Ante el primer fallo se cancela lo pendiente y se propaga el error sin
+        esperar a las extracciones que siguen en curso.
+        """
+        executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="VMExtract")
+        try:
+            futures = {
+                name: executor.submit(getattr(svc, method))
+                for name, method in enabled
+            }
+            done, _ = wait(futures.values(), return_when=FIRST_EXCEPTION)
+            for future in done:
+                error = future.exception()
+                if error is not None:
+                    raise error
+            return {name: future.result() for name, future in futures.items()}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def _scan_sequential(self, profiles, config, result, emit, total):
         """Escaneo uno por uno."""
@@ -293,77 +433,102 @@ class ConnectionManager:
             pct_start = (idx / total) * 100
             pct_end   = ((idx + 1) / total) * 100
 
-            emit(profile, f"Conectando a {profile.display_name}...", pct_start)
+            emit(profile, _MSG_CONNECTING, pct_start)
             inventory = self._scan_single(profile, config)
 
             if inventory is not None:
-                result.results_by_source[profile.id] = inventory
-                result.completed_profiles.append(profile)
+                result.add_source(profile, inventory)
                 emit(
                     profile,
-                    f"✅ {profile.display_name} — {profile.vms_found} VMs, {profile.hosts_found} Hosts",
+                    _MSG_OK_FULL,
                     pct_end,
                     vms=profile.vms_found,
                     hosts=profile.hosts_found,
                 )
             else:
-                result.failed_profiles.append(profile)
+                result.add_failure(profile)
                 emit(
                     profile,
-                    f"❌ {profile.display_name} — {profile.error_message}",
+                    _MSG_ERR,
                     pct_end,
                     error=profile.error_message,
                 )
 
     def _scan_parallel(self, profiles, config, result, emit, total):
-        """Escaneo en paralelo con ThreadPoolExecutor."""
-        futures_map = {}
+        """
+        Escaneo en paralelo: un event loop asyncio lanza una corrutina por
+        perfil. pyVmomi es bloqueante, así que cada escaneo corre en el pool
+        de hilos del loop, acotado a config.max_workers.
+        """
+        asyncio.run(self._scan_parallel_async(profiles, config, result, emit, total))
 
-        with ThreadPoolExecutor(
+    async def _scan_parallel_async(self, profiles, config, result, emit, total):
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(
             max_workers=min(config.max_workers, total),
             thread_name_prefix="VMScan"
-        ) as executor:
-            for profile in profiles:
-                emit(profile, f"Encolando {profile.display_name}...", 0)
-                future = executor.submit(self._scan_single, profile, config)
-                futures_map[future] = profile
-
-            completed = 0
-            for future in as_completed(futures_map):
-                profile = futures_map[future]
+        ))
+
+        completed = 0
+
+        def started(profile: ConnectionProfile):
+            # Corre en el hilo del pool cuando el perfil sale de la cola
+            emit(profile, _MSG_CONNECTING, (completed / total) * 100)
+
+        pending = set()
+        for profile in profiles:
+            emit(profile, _MSG_QUEUED, 0)
+            pending.add(asyncio.create_task(self._scan_single_async(profile, config, started)))
+
+        while pending:
+            # Los perfiles aún en cola ven _stop_event al arrancar y se omiten
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                profile, inventory = task.result()
                 completed += 1
                 pct = (completed / total) * 100
 
-                try:
-                    inventory = future.result()
-                except Exception as e:
-                    profile.status = ConnectionStatus.ERROR
-                    profile.error_message = str(e)
-                    inventory = None
-
                 if inventory is not None:
-                    result.results_by_source[profile.id] = inventory
-                    result.completed_profiles.append(profile)
+                    result.add_source(profile, inventory)
                     emit(
                         profile,
-                        f"✅ {profile.display_name} — {profile.vms_found} VMs",
+                        _MSG_OK_SHORT,
                         pct,
                         vms=profile.vms_found,
                         hosts=profile.hosts_found,
                     )
                 else:
-                    result.failed_profiles.append(profile)
+                    result.add_failure(profile)
                     emit(
                         profile,
-                        f"❌ {profile.display_name} — {profile.error_message}",
+                        _MSG_ERR,
                         pct,
                         error=profile.error_message,
                     )
 
+    async def _scan_single_async(
+        self,
+        profile: ConnectionProfile,
+        config: ScanConfig,
+        on_start: Optional[Callable[[ConnectionProfile], None]] = None,
+    ):
+        """
+        Ejecuta _scan_single en el pool del loop sin bloquear el event loop.
+        Retorna (perfil, inventario) para no tener que mapear tarea → perfil.
+        """
+        try:
+            inventory = await asyncio.to_thread(self._scan_single, profile, config, on_start)
+        except Exception as e:
+            profile.status = ConnectionStatus.ERROR
+            profile.error_message = str(e)
+            inventory = None
+        return profile, inventory
+
     def _tag_inventory(self, inventory, profile: ConnectionProfile):
         """
-        Inyecta el campo 'source_name' en cada objeto del inventario
-        para que el exportador sepa de qué fuente viene cada registro.
+        Inyecta el campo 'source_name' en cada objeto del inventario.
+        Solo se usa con ScanConfig.tag_source, para consumidores que mezclan
+        registros de varias fuentes sin pasar por results_by_source.
         """
         source = profile.display_name
         if inventory is None:
@@ -142,7 +142,6 @@ class VMwareService:
         vm.hostname = self._prop(props, "name", "")
         vm.vcpu = self._prop(props, "config.hardware.numCPU", 0) or 0
         vm.ram_mb = self._prop(props, "config.hardware.memoryMB", 0) or 0
-        vm.ram_gb = round(vm.ram_mb / 1024, 2)
         vm.description = (self._prop(props, "config.annotation", "") or "").replace("\n", " ")
         vm.hw_version = self._prop(props, "config.version", "") or ""
         vm.tools_status = str(self._prop(props, "guest.toolsStatus", "unknown") or "unknown")
@@ -174,6 +173,7 @@ class VMwareService:
             vm.datastore = vmpath.split("[")[1].split("]")[0]
 
         devices = self._prop(props, "config.hardware.device", []) or []
+        nics, disks = [], []
         for device in devices:
             if isinstance(device, vim.vm.device.VirtualEthernetCard):
                 nic = NicInfo()
@@ -190,7 +190,7 @@ class VMwareService:
                         nic.network = device.backing.port.portgroupKey or ""
                     except Exception as _e:
                         self._log(f"[DEBUG] Excepcion ignorada: {_e}")
-                vm.nics.append(nic)
+                nics.append(nic)
             elif isinstance(device, vim.vm.device.VirtualDisk):
                 disk = DiskInfo()
                 disk.label = (device.deviceInfo.label if device.deviceInfo else "")
@@ -202,7 +202,12 @@ class VMwareService:
                         disk.datastore = device.backing.datastore.name
                     except Exception as _e:
                         self._log(f"[DEBUG] Excepcion ignorada: {_e}")
-                vm.disks.append(disk)
+                disks.append(disk)
+
+        if nics:
+            vm.nics = nics
+        if disks:
+            vm.disks = disks
 
         guest_net = self._prop(props, "guest.net", []) or []
         for i, nic in enumerate(vm.nics):
@@ -264,11 +269,14 @@ class VMwareService:
                 if ip and not ip.startswith("169"):
                     h.ip_address = ip
                     break
+        datastores = []
         for ds_ref in (self._prop(props, "datastore", []) or []):
             try:
-                h.datastores.append(ds_ref.name)
+                datastores.append(ds_ref.name)
             except Exception as _e:
                 self._log(f"[DEBUG] Excepcion ignorada: {_e}")
+        if datastores:
+            h.datastores = datastores
         parent = self._prop(props, "parent", None)
         if parent:
             try:
@@ -300,11 +308,14 @@ class VMwareService:
             ds.free_gb = round(free / (1024 ** 3), 2)
             ds.used_gb = round(ds.capacity_gb - ds.free_gb, 2)
             ds.accessible = bool(self._prop(p, "summary.accessible", True))
+            hosts = []
             for hm in (self._prop(p, "host", []) or []):
                 try:
-                    ds.hosts.append(hm.key.name)
+                    hosts.append(hm.key.name)
                 except Exception as _e:
                     self._log(f"[DEBUG] Excepcion ignorada: {_e}")
+            if hosts:
+                ds.hosts = hosts
             ds_list.append(ds)
         self._log(f"[OK] {len(ds_list)} Datastores procesados.")
         return ds_list
@@ -320,11 +331,14 @@ class VMwareService:
             net = NetworkModel()
             net.name = self._prop(p, "name", "")
             net.net_type = "Standard"
+            hosts = []
             for h in (self._prop(p, "host", []) or []):
                 try:
-                    net.hosts.append(h.name)
+                    hosts.append(h.name)
                 except Exception as _e:
                     self._log(f"[DEBUG] Excepcion ignorada: {_e}")
+            if hosts:
+                net.hosts = hosts
             net.vms_count = len(self._prop(p, "vm", []) or [])
             networks.append(net)
         try:
@@ -341,11 +355,14 @@ class VMwareService:
                         net.vlan_id = str(cfg.vlan.vlanId)
                     except Exception as _e:
                         self._log(f"[DEBUG] Excepcion ignorada: {_e}")
+                hosts = []
                 for h in (self._prop(p, "host", []) or []):
                     try:
-                        net.hosts.append(h.name)
+                        hosts.append(h.name)
                     except Exception as _e:
                         self._log(f"[DEBUG] Excepcion ignorada: {_e}")
+                if hosts:
+                    net.hosts = hosts
                 net.vms_count = len(self._prop(p, "vm", []) or [])
                 networks.append(net)
         except Exception as _e:
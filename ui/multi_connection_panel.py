@@ -3,9 +3,10 @@ ui/multi_connection_panel.py
 Panel de gestión de múltiples conexiones VMware.
 Permite agregar, editar, eliminar y probar conexiones individuales.
 """
-from tkinter import ttk, messagebox, BooleanVar, DoubleVar, IntVar, StringVar, Toplevel
-import threading
-from typing import Callable, Optional, List
+from tkinter import ttk, messagebox, BooleanVar, DoubleVar, IntVar, StringVar, Toplevel, TclError
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, List
 
 from models.connection_profile import (
     ConnectionProfile, ConnectionType, ConnectionStatus, ScanConfig
@@ -25,6 +26,98 @@ STATUS_COLORS = {
     ConnectionStatus.SKIPPED:  ("#F5F5F5", "#757575"),   # gris
 }
 
+# Tag del Treeview por estado; los no listados usan "pending"
+_STATUS_TAG = {
+    ConnectionStatus.OK:       "ok",
+    ConnectionStatus.DONE:     "done",
+    ConnectionStatus.ERROR:    "error",
+    ConnectionStatus.SCANNING: "scanning",
+    ConnectionStatus.TESTING:  "testing",
+}
+
+# Colores (fondo, texto) por tag, derivados de STATUS_COLORS
+STATUS_COLORS_BY_TAG = {"pending": STATUS_COLORS[ConnectionStatus.PENDING]}
+STATUS_COLORS_BY_TAG.update(
+    (tag, STATUS_COLORS[status]) for status, tag in _STATUS_TAG.items()
+)
+
+# Columnas de la tabla de conexiones: (id, encabezado, ancho)
+_COL_DEFS = (
+    ("alias",  "Alias/Nombre",   140),
+    ("type",   "Tipo",            90),
+    ("host",   "IP / FQDN",      150),
+    ("port",   "Puerto",           55),
+    ("user",   "Usuario",         100),
+    ("status", "Estado",          110),
+    ("vms",    "VMs",              50),
+    ("hosts",  "Hosts",            50),
+    ("error",  "Último Error",    200),
+)
+_COLUMNS = tuple(col_id for col_id, _, _ in _COL_DEFS)
+
+# ─────────────────────────────────────────────────────────
+# Parámetros de refresco y concurrencia
+# ─────────────────────────────────────────────────────────
+# Intervalo (ms) con el que la UI drena los eventos de progreso del escaneo
+PROGRESS_POLL_MS = 50
+# Intervalo (ms) y tope por tick del bombeo de mensajes de log desde hilos
+LOG_PUMP_MS = 50
+LOG_PUMP_MAX = 200
+# A partir de cuántas filas nuevas/cambiadas se aplica un único script Tcl
+BULK_INSERT_MIN = 20
+# Pruebas de conexión simultáneas como máximo (hilos del pool de _on_test)
+TEST_WORKERS = 4
+# Pausa (ms) sin teclear antes de validar el formulario de conexión
+VALIDATE_DEBOUNCE_MS = 150
+
+# Escapes para pasar texto como una palabra Tcl literal
+_TCL_ESCAPES = str.maketrans({
+    "\\": "\\\\", "{": "\\{", "}": "\\}", "[": "\\[", "]": "\\]",
+    "$": "\\$", '"': '\\"', ";": "\\;", " ": "\\ ",
+    "\n": "\\n", "\t": "\\t", "\r": "\\r", "\v": "\\v", "\f": "\\f",
+    "\0": None,    # Tcl_Eval corta el script en el primer NUL
+})
+
+# ─────────────────────────────────────────────────────────
+# Helpers de tabla y diálogos
+# ─────────────────────────────────────────────────────────
+def _init_treeview_tags(tree):
+    """Configura en `tree` un tag por estado con los colores de STATUS_COLORS."""
+    for tag, (bg, fg) in STATUS_COLORS_BY_TAG.items():
+        tree.tag_configure(tag, background=bg, foreground=fg)
+
+def _row_for(p: ConnectionProfile) -> tuple:
+    """(values, tag) de la fila del Treeview para un perfil."""
+    values = (
+        p.alias,
+        p.connection_type.value,
+        p.host,
+        p.port,
+        p.username,
+        p.status.value,
+        p.vms_found   if p.vms_found   else "-",
+        p.hosts_found if p.hosts_found else "-",
+        p.error_short,
+    )
+    return values, _STATUS_TAG.get(p.status, "pending")
+
+def _tcl_quote(value) -> str:
+    """Convierte un valor en una palabra Tcl que se evalúa a su str() (sin NUL)."""
+    return str(value).translate(_TCL_ESCAPES) or "{}"
+
+def _tcl_row_cmd(tree: str, op: str, iid: str, values, tag: str) -> str:
+    """Comando Tcl que inserta (op="insert") o actualiza (op="item") una fila."""
+    head = (f"{tree} insert {{}} end -id {_tcl_quote(iid)}" if op == "insert"
+            else f"{tree} item {_tcl_quote(iid)}")
+    return (f"{head} -values [list {' '.join(map(_tcl_quote, values))}]"
+            f" -tags [list {_tcl_quote(tag)}]")
+
+def _center_on_parent(win, parent):
+    """Ubica `win` centrado sobre `parent` usando su tamaño requerido."""
+    x = parent.winfo_rootx() + (parent.winfo_width() - win.winfo_reqwidth()) // 2
+    y = parent.winfo_rooty() + (parent.winfo_height() - win.winfo_reqheight()) // 2
+    win.geometry(f"+{x}+{y}")
+
 class AddConnectionDialog(Toplevel):
     """Diálogo modal para agregar o editar un perfil de conexión."""
 
@@ -32,6 +125,7 @@ class AddConnectionDialog(Toplevel):
         super().__init__(parent)
         self.result: Optional[ConnectionProfile] = None
         self._profile = profile
+        self._validate_job = None
 
         self.title("Agregar Conexión" if profile is None else "Editar Conexión")
         self.resizable(False, False)
@@ -43,11 +137,11 @@ class AddConnectionDialog(Toplevel):
         if profile:
             self._populate(profile)
 
-        # Centrar
-        self.update_idletasks()
-        x = parent.winfo_rootx() + (parent.winfo_width() - self.winfo_width()) // 2
-        y = parent.winfo_rooty() + (parent.winfo_height() - self.winfo_height()) // 2
-        self.geometry(f"+{x}+{y}")
+        # Validación en vivo: las teclas de cualquier Entry llegan al Toplevel
+        self.bind("<KeyRelease>", self._schedule_validate)
+
+        # Centrar cuando Tk haya calculado el tamaño pedido (sin forzar layout)
+        self.after_idle(_center_on_parent, self, parent)
 
     def _build_ui(self):
         pad = {"padx": 10, "pady": 5}
@@ -96,9 +190,14 @@ class AddConnectionDialog(Toplevel):
             variable=self._ssl_var
         ).grid(row=6, column=0, columnspan=2, sticky="w", **pad)
 
+        # Aviso de validación en vivo
+        self._hint_var = StringVar()
+        ttk.Label(frame, textvariable=self._hint_var, foreground="#B71C1C").grid(
+            row=7, column=0, columnspan=2, sticky="w", padx=10)
+
         # Botones
         btn_frame = ttk.Frame(frame)
-        btn_frame.grid(row=7, column=0, columnspan=2, pady=(10, 0))
+        btn_frame.grid(row=8, column=0, columnspan=2, pady=(10, 0))
         ttk.Button(btn_frame, text="✅ Guardar",  command=self._on_save).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="❌ Cancelar", command=self.destroy).pack(side="left", padx=5)
 
@@ -112,43 +211,82 @@ class AddConnectionDialog(Toplevel):
         self._user_var.set(profile.username)
         self._ssl_var.set(profile.ignore_ssl)
 
-    def _on_save(self):
-        host = self._host_var.get().strip()
-        user = self._user_var.get().strip()
-        pwd  = self._pass_var.get()
+    def _collect_form(self) -> dict:
+        """Lee cada variable del formulario una sola vez."""
+        try:
+            port = self._port_var.get()
+        except TclError:
+            port = None     # texto no numérico en el Entry
+        return {
+            "type":       self._type_var.get(),
+            "alias":      self._alias_var.get().strip(),
+            "host":       self._host_var.get().strip(),
+            "port":       port,
+            "user":       self._user_var.get().strip(),
+            "password":   self._pass_var.get(),
+            "ignore_ssl": self._ssl_var.get(),
+        }
+
+    def _validate(self, form: dict) -> Optional[str]:
+        """Primer error del formulario, o None si es válido."""
+        if not form["host"]:
+            return "El campo IP/FQDN es obligatorio."
+        if not form["user"]:
+            return "El campo Usuario es obligatorio."
+        if not form["password"] and self._profile is None:
+            return "La contraseña es obligatoria."
+        if form["port"] is None:
+            return "El puerto debe ser numérico."
+        return None
+
+    def _schedule_validate(self, _event=None):
+        """Reprograma la validación hasta que el usuario deje de teclear."""
+        if self._validate_job is not None:
+            self.after_cancel(self._validate_job)
+        self._validate_job = self.after(VALIDATE_DEBOUNCE_MS, self._run_validate)
+
+    def _run_validate(self):
+        self._validate_job = None
+        self._hint_var.set(self._validate(self._collect_form()) or "")
+
+    def destroy(self):
+        if self._validate_job is not None:
+            self.after_cancel(self._validate_job)
+            self._validate_job = None
+        super().destroy()
 
-        if not host:
-            messagebox.showwarning("Validación", "El campo IP/FQDN es obligatorio.", parent=self)
-            return
-        if not user:
-            messagebox.showwarning("Validación", "El campo Usuario es obligatorio.", parent=self)
-            return
-        if not pwd and self._profile is None:
-            messagebox.showwarning("Validación", "La contraseña es obligatoria.", parent=self)
+    def _on_save(self):
+        form = self._collect_form()
+        error = self._validate(form)
+        if error:
+            messagebox.showwarning("Validación", error, parent=self)
             return
 
-        conn_type = ConnectionType(self._type_var.get())
+        host      = form["host"]
+        alias     = form["alias"] or host
+        pwd       = form["password"]
+        conn_type = ConnectionType(form["type"])
 
         if self._profile:
             # Edición: actualizar in-place
             self._profile.host            = host
-            self._profile.username        = user
+            self._profile.username        = form["user"]
             self._profile.connection_type = conn_type
-            self._profile.port            = self._port_var.get()
-            self._profile.ignore_ssl      = self._ssl_var.get()
-            self._profile.alias           = self._alias_var.get().strip() or host
+            self._profile.port            = form["port"]
+            self._profile.ignore_ssl      = form["ignore_ssl"]
+            self._profile.alias           = alias
             if pwd:
                 self._profile.password = pwd
             self.result = self._profile
         else:
             self.result = ConnectionProfile(
                 host            = host,
-                username        = user,
+                username        = form["user"],
                 password        = pwd,
                 connection_type = conn_type,
-                port            = self._port_var.get(),
-                ignore_ssl      = self._ssl_var.get(),
-                alias           = self._alias_var.get().strip() or host,
+                port            = form["port"],
+                ignore_ssl      = form["ignore_ssl"],
+                alias           = alias,
             )
 
         self.destroy()
@@ -168,10 +306,8 @@ class ScanConfigDialog(Toplevel):
 
         self._build_ui()
 
-        self.update_idletasks()
-        x = parent.winfo_rootx() + (parent.winfo_width() - self.winfo_width()) // 2
-        y = parent.winfo_rooty() + (parent.winfo_height() - self.winfo_height()) // 2
-        self.geometry(f"+{x}+{y}")
+        # Centrar cuando Tk haya calculado el tamaño pedido (sin forzar layout)
+        self.after_idle(_center_on_parent, self, parent)
 
     def _build_ui(self):
         pad = {"padx": 10, "pady": 5}
@@ -278,9 +414,27 @@ class MultiConnectionPanel(ttk.Frame):
         self._on_log           = on_log
         self._scan_config      = ScanConfig()
         self._scan_thread      = None
+        self._row_cache: Dict[str, tuple] = {}    # iid → (values, tag) ya pintados
+        self._last_profiles_digest: int = 0         # hash del último estado pintado
+
+        # Progreso pendiente de pintar (se aplica en _flush_progress)
+        self._pending_progress: Optional[ScanProgress] = None
+        self._pending_logs: List[str] = []
+        self._pending_rows: Dict[str, None] = {}    # profile_id con fila por repintar
+        self._redraw_scheduled = False
+
+        # Mensajes de log producidos en hilos de trabajo; los bombea _pump_log_queue
+        self._log_q: queue.Queue = queue.Queue()
+        self._log_pump_job = None
+
+        # Pool fijo para las pruebas de conexión; se cierra en _on_destroy
+        self._test_pool = ThreadPoolExecutor(max_workers=TEST_WORKERS, thread_name_prefix="VMTest")
 
         self._build_ui()
 
+        self._log_pump_job = self.after(LOG_PUMP_MS, self._pump_log_queue)
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
     def _build_ui(self):
         # ── Título
         header = ttk.Frame(self)
@@ -334,28 +488,15 @@ class MultiConnectionPanel(ttk.Frame):
         table_frame = ttk.LabelFrame(self, text="Conexiones Registradas", padding=5)
         table_frame.pack(fill="both", expand=True, padx=5, pady=5)
 
-        columns = ("alias", "type", "host", "port", "user", "status", "vms", "hosts", "error")
         self._tree = ttk.Treeview(
             table_frame,
-            columns=columns,
+            columns=_COLUMNS,
             show="headings",
             height=10,
             selectmode="browse"
         )
 
-        col_defs = [
-            ("alias",  "Alias/Nombre",   140),
-            ("type",   "Tipo",            90),
-            ("host",   "IP / FQDN",      150),
-            ("port",   "Puerto",           55),
-            ("user",   "Usuario",         100),
-            ("status", "Estado",          110),
-            ("vms",    "VMs",              50),
-            ("hosts",  "Hosts",            50),
-            ("error",  "Último Error",    200),
-        ]
-
-        for col_id, heading, width in col_defs:
+        for col_id, heading, width in _COL_DEFS:
             self._tree.heading(col_id, text=heading, anchor="w")
             self._tree.column(col_id, width=width, anchor="w")
 
@@ -371,12 +512,7 @@ class MultiConnectionPanel(ttk.Frame):
         table_frame.columnconfigure(0, weight=1)
 
         # Tag styles
-        self._tree.tag_configure("ok",       background="#E8F5E9", foreground="#1B5E20")
-        self._tree.tag_configure("error",    background="#FFEBEE", foreground="#B71C1C")
-        self._tree.tag_configure("scanning", background="#E3F2FD", foreground="#0D47A1")
-        self._tree.tag_configure("done",     background="#E8F5E9", foreground="#1B5E20")
-        self._tree.tag_configure("pending",  background="#FFFFFF", foreground="#000000")
-        self._tree.tag_configure("testing",  background="#FFF9C4", foreground="#7D6608")
+        _init_treeview_tags(self._tree)
 
         # Double-click edita
         self._tree.bind("<Double-1>", lambda e: self._on_edit())
@@ -445,12 +581,19 @@ class MultiConnectionPanel(ttk.Frame):
         profile.status = ConnectionStatus.TESTING
         self._refresh_table()
 
-        def test_thread():
-            ok, msg = self._manager.test_connection(profile)
-            self.after(0, lambda: self._on_log(msg))
-            self.after(0, self._refresh_table)
+        fut = self._test_pool.submit(self._manager.test_connection, profile)
+        fut.add_done_callback(self._on_test_done)
 
-        threading.Thread(target=test_thread, daemon=True).start()
+    def _on_test_done(self, fut: Future):
+        """Corre en el hilo del pool: solo encola el mensaje y agenda el repintado."""
+        if fut.cancelled():
+            return
+        ok, msg = fut.result()
+        self._log_q.put(msg)
+        try:
+            self.after(0, self._refresh_table)
+        except (RuntimeError, TclError):
+            pass    # el panel se destruyó mientras la prueba estaba en curso
 
     def _on_config(self):
         dlg = ScanConfigDialog(self, self._scan_config)
@@ -478,6 +621,7 @@ class MultiConnectionPanel(ttk.Frame):
             on_progress=self._on_progress,
             on_complete=self._on_complete,
         )
+        self.after(PROGRESS_POLL_MS, self._poll_progress)
 
     def _on_stop(self):
         self._manager.stop_scan()
@@ -485,21 +629,56 @@ class MultiConnectionPanel(ttk.Frame):
         self._stop_btn.config(state="disabled")
 
     # ─────────────────────────────────────────────
-    # Callbacks de escaneo (vienen desde hilos)
+    # Callbacks de escaneo
     # ─────────────────────────────────────────────
 
+    def _poll_progress(self):
+        """
+        Drena por lotes los eventos encolados mientras el escaneo sigue vivo.
+        Cada evento deja su línea de log; el repintado ya se agrupa por
+        perfil en _on_progress/_flush_progress.
+        """
+        self._manager.drain_progress()
+        if self._scan_thread is not None and self._scan_thread.is_alive():
+            self.after(PROGRESS_POLL_MS, self._poll_progress)
+
     def _on_progress(self, prog: ScanProgress):
-        """Llamado desde hilo de escaneo — usa after() para UI thread."""
-        def update():
+        """
+        Llamado desde drain_progress(), ya en el hilo de UI. Solo acumula el
+        evento y agenda un único repintado en el próximo idle.
+        """
+        self._pending_progress = prog
+        self._pending_rows[prog.profile_id] = None
+        self._pending_logs.append(f"  [{prog.profile_name}] {prog.message}")
+        if not self._redraw_scheduled:
+            self._redraw_scheduled = True
+            self.after_idle(self._flush_progress)
+
+    def _flush_progress(self):
+        """Aplica de una vez todo el progreso acumulado desde el último repintado."""
+        self._redraw_scheduled = False
+        prog, self._pending_progress = self._pending_progress, None
+        logs, self._pending_logs = self._pending_logs, []
+        rows, self._pending_rows = self._pending_rows, {}
+        if prog is None and not logs:
+            return
+
+        if prog is not None:
             self._progress_var.set(prog.progress_pct)
             self._progress_label.config(text=f"{prog.progress_pct:.0f}%")
-            self._on_log(f"  [{prog.profile_name}] {prog.message}")
-            self._refresh_table()
-        self.after(0, update)
+        for line in logs:
+            self._on_log(line)
+        # Un evento solo cambia la fila de su perfil
+        for profile_id in rows:
+            self._refresh_row(profile_id)
 
     def _on_complete(self, result: ConsolidatedResult):
-        """Llamado cuando terminan todos los escaneos."""
+        """Llamado desde el hilo de escaneo cuando terminan todos los perfiles."""
         def finalize():
+            # Entregar los eventos que queden antes del resumen final
+            while self._manager.drain_progress():
+                pass
+            self._flush_progress()
             self._scan_btn.config(state="normal")
             self._stop_btn.config(state="disabled")
             self._progress_var.set(100)
@@ -526,46 +705,107 @@ class MultiConnectionPanel(ttk.Frame):
     # Utilidades
     # ─────────────────────────────────────────────
 
+    def _pump_log_queue(self):
+        """Reenvía a on_log los mensajes encolados por hilos (máx. LOG_PUMP_MAX por tick)."""
+        for _ in range(LOG_PUMP_MAX):
+            try:
+                msg = self._log_q.get_nowait()
+            except queue.Empty:
+                break
+            self._on_log(msg)
+        self._log_pump_job = self.after(LOG_PUMP_MS, self._pump_log_queue)
+
+    def _on_destroy(self, event):
+        if event.widget is not self:
+            return
+        if self._log_pump_job is not None:
+            self.after_cancel(self._log_pump_job)
+            self._log_pump_job = None
+        self._test_pool.shutdown(wait=False, cancel_futures=True)
+
     def _refresh_table(self):
-        """Reconstruye las filas del Treeview desde los perfiles actuales."""
-        selected_id = None
-        sel = self._tree.selection()
-        if sel:
-            selected_id = self._tree.item(sel[0], "values")[0] if sel else None
-
-        self._tree.delete(*self._tree.get_children())
-
-        for p in self._manager.profiles:
-            status_text = p.status.value
-            tag = {
-                ConnectionStatus.OK:       "ok",
-                ConnectionStatus.DONE:     "done",
-                ConnectionStatus.ERROR:    "error",
-                ConnectionStatus.SCANNING: "scanning",
-                ConnectionStatus.TESTING:  "testing",
-            }.get(p.status, "pending")
-
-            self._tree.insert(
-                "",
-                "end",
-                iid=p.id,
-                values=(
-                    p.alias,
-                    p.connection_type.value,
-                    p.host,
-                    p.port,
-                    p.username,
-                    status_text,
-                    p.vms_found   if p.vms_found   else "-",
-                    p.hosts_found if p.hosts_found else "-",
-                    p.error_message[:60] if p.error_message else "",
-                ),
-                tags=(tag,)
-            )
+        """
+        Sincroniza el Treeview con los perfiles actuales tocando solo las
+        filas nuevas, modificadas o eliminadas. Como las filas existentes no
+        se recrean, la selección se conserva sola.
+        """
+        profiles = self._manager.profiles
+        digest = hash(tuple(
+            (p.id, p.alias, p.connection_type, p.host, p.port, p.username,
+             p.status, p.vms_found, p.hosts_found, p.error_message)
+            for p in profiles
+        ))
+        if digest == self._last_profiles_digest:
+            return
+        self._last_profiles_digest = digest
+
+        current_ids = {p.id for p in profiles}
+
+        for iid in [iid for iid in self._row_cache if iid not in current_ids]:
+            if self._tree.exists(iid):
+                self._tree.delete(iid)
+            del self._row_cache[iid]
+
+        new_rows, changed = [], []
+        for p in profiles:
+            row = _row_for(p)
+            values, tag = row
+            cached = self._row_cache.get(p.id)
+            if cached is None:
+                new_rows.append((p.id, values, tag))
+            elif cached != row:
+                changed.append((p.id, values, tag))
+            self._row_cache[p.id] = row
+
+        if len(changed) >= BULK_INSERT_MIN:
+            # Casi toda la tabla cambia (p. ej. tras reset_all_statuses)
+            self._bulk_rebuild(new_rows, changed, [p.id for p in profiles])
+            return
+        for iid, values, tag in changed:
+            self._tree.item(iid, values=values, tags=(tag,))
+        if len(new_rows) >= BULK_INSERT_MIN:
+            self._bulk_insert(new_rows)
+        else:
+            for iid, values, tag in new_rows:
+                self._tree.insert("", "end", iid=iid, values=values, tags=(tag,))
 
-        # Restaurar selección
-        if selected_id and self._tree.exists(selected_id):
-            self._tree.selection_set(selected_id)
+    def _refresh_row(self, profile_id: str):
+        """Repinta solo la fila de un perfil; si aún no existe, sincroniza la tabla."""
+        if profile_id not in self._row_cache:
+            self._refresh_table()
+            return
+        p = self._manager.get_profile(profile_id)
+        if p is None:
+            self._refresh_table()
+            return
+        row = _row_for(p)
+        if self._row_cache[profile_id] != row:
+            values, tag = row
+            self._tree.item(profile_id, values=values, tags=(tag,))
+            self._row_cache[profile_id] = row
+            self._last_profiles_digest = 0    # la tabla ya no es la del último digest
+
+    def _bulk_insert(self, rows):
+        """Inserta (iid, values, tag) al final del Treeview con un solo tk.eval."""
+        tree = str(self._tree)
+        self._tree.tk.eval("\n".join(_tcl_row_cmd(tree, "insert", *r) for r in rows))
+
+    def _bulk_rebuild(self, new_rows, changed, order: List[str]):
+        """
+        Aplica muchas filas con las raíces desenganchadas del Treeview, para
+        que Tk no rehaga el layout por fila, y las reengancha en `order`.
+        Todo va en un único script Tcl.
+        """
+        tree = str(self._tree)
+        sel = self._tree.selection()
+        script = [f"{tree} detach [{tree} children {{}}]"]
+        script += [_tcl_row_cmd(tree, "item", *r) for r in changed]
+        script += [_tcl_row_cmd(tree, "insert", *r) for r in new_rows]
+        script.append(f"{tree} children {{}} [list {' '.join(map(_tcl_quote, order))}]")
+        self._tree.tk.eval("\n".join(script))
+        # detach quita las filas de la selección; restaurarla si se perdió
+        if sel and self._tree.selection() != sel:
+            self._tree.selection_set(sel)
 
     def _get_selected_profile(self) -> Optional[ConnectionProfile]:
         sel = self._tree.selection()
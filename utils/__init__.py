@@ -3,7 +3,7 @@ from .credentials import (
     hash_password, verify_password,
     encrypt_password, decrypt_password,
     save_profile, load_profile, load_all_profiles,
-    delete_profile, list_profiles, format_bytes,
+    delete_profile, list_profiles, format_bytes, ProfileStore,
 )
 
 __all__ = [
@@ -11,5 +11,5 @@ __all__ = [
     "hash_password", "verify_password",
     "encrypt_password", "decrypt_password",
     "save_profile", "load_profile", "load_all_profiles",
-    "delete_profile", "list_profiles", "format_bytes",
+    "delete_profile", "list_profiles", "format_bytes", "ProfileStore",
 ]
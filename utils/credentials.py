@@ -2,9 +2,12 @@
 Utilidades: credenciales seguras, perfiles, helpers
 """
 import json
+import os
 import base64
+import hashlib
+import hmac
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable
 
 try:
     import bcrypt
@@ -13,15 +16,50 @@ except ImportError:
     BCRYPT_AVAILABLE = False
 
 try:
-    from cryptography.fernet import Fernet
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDF
     CRYPTO_AVAILABLE = True
 except ImportError:
     CRYPTO_AVAILABLE = False
 
+if CRYPTO_AVAILABLE:
+    # Obligatorio junto a cryptography: los registros cifrados se empaquetan con msgpack
+    import msgpack
+
 APP_DATA_DIR = Path.home() / ".vmware_inventory"
 PROFILES_FILE = APP_DATA_DIR / "profiles.enc"
 KEY_FILE = APP_DATA_DIR / ".key"
 
+# Cifrado de perfiles: AES-256-GCM, token = nonce(12) || ciphertext+tag.
+# Los tokens Fernet previos ("gAAAA...") se siguen leyendo y se reescriben
+# en AES-GCM en la siguiente escritura.
+_NONCE_LEN = 12
+_FERNET_PREFIX = b"gAAAAA"
+_HKDF_INFO = b"vmware_inventory/profiles/aes-256-gcm"
+
+# Instancias cacheadas (ver _get_fernet / _get_aead)
+_FERNET: Optional["Fernet"] = None
+_AEAD: Optional["AESGCM"] = None
+
+def _dumps(obj) -> bytes:
+    """JSON compacto en UTF-8 (orjson si está instalado)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def _loads(data: bytes):
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def ensure_app_dir():
     APP_DATA_DIR.mkdir(exist_ok=True)
 
@@ -34,31 +72,75 @@ def get_or_create_key() -> bytes:
     KEY_FILE.chmod(0o600)
     return key
 
+def _get_fernet() -> "Fernet":
+    """Fernet construido una sola vez con la clave de KEY_FILE."""
+    global _FERNET
+    if _FERNET is None:
+        _FERNET = Fernet(get_or_create_key())
+    return _FERNET
+
+def _get_aead() -> "AESGCM":
+    """
+    AESGCM con clave de 32 bytes derivada (HKDF-SHA256) de KEY_FILE.
+    KEY_FILE conserva el formato Fernet porque CredentialManager lo comparte.
+    """
+    global _AEAD
+    if _AEAD is None:
+        master = base64.urlsafe_b64decode(get_or_create_key())
+        key = HKDF(algorithm=hashes.SHA256(), length=32,
+                   salt=None, info=_HKDF_INFO).derive(master)
+        _AEAD = AESGCM(key)
+    return _AEAD
+
+def _reset_fernet():
+    """Descarta las caches; llamar tras rotar o reemplazar KEY_FILE."""
+    global _FERNET, _AEAD
+    _FERNET = None
+    _AEAD = None
+    _STORE.invalidate()
+
+def _is_fernet_token(token: bytes) -> bool:
+    return token[:len(_FERNET_PREFIX)] == _FERNET_PREFIX
+
+def _encrypt_bytes(data: bytes) -> bytes:
+    nonce = os.urandom(_NONCE_LEN)
+    return nonce + _get_aead().encrypt(nonce, data, None)
+
+def _decrypt_bytes(token: bytes) -> bytes:
+    if _is_fernet_token(token):
+        try:
+            return _get_fernet().decrypt(token)
+        except InvalidToken:
+            pass    # nonce AES-GCM que casualmente empieza igual
+    return _get_aead().decrypt(token[:_NONCE_LEN], token[_NONCE_LEN:], None)
+
 def encrypt_password(password: str) -> str:
     if not CRYPTO_AVAILABLE:
         return base64.b64encode(password.encode()).decode()
-    f = Fernet(get_or_create_key())
-    return f.encrypt(password.encode()).decode()
+    return base64.urlsafe_b64encode(_encrypt_bytes(password.encode())).decode()
 
 def decrypt_password(encrypted: str) -> str:
     if not CRYPTO_AVAILABLE:
         return base64.b64decode(encrypted.encode()).decode()
-    f = Fernet(get_or_create_key())
-    return f.decrypt(encrypted.encode()).decode()
+    token = encrypted.encode()
+    if not _is_fernet_token(token):
+        token = base64.urlsafe_b64decode(token)
+    return _decrypt_bytes(token).decode()
 
 def hash_password(password: str) -> str:
     """
     Hashea una contrasena con bcrypt (coste=12) o PBKDF2 como fallback.
     FIX CodeQL py/weak-sensitive-data-hashing (linea 45).
+    Es lento a propósito: no cambiar por un hash rápido (SHA/BLAKE2).
+    pbkdf2_hmac corre dentro de OpenSSL, que usa SHA-NI si la CPU lo tiene.
     """
     if BCRYPT_AVAILABLE:
         return bcrypt.hashpw(
             password.encode("utf-8"),
             bcrypt.gensalt(rounds=12),
         ).decode("utf-8")
-    import hashlib as _hl, os as _os
-    salt = _os.urandom(32)
-    dk = _hl.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 600_000)
+    salt = os.urandom(32)
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 600_000)
     return "pbkdf2:" + salt.hex() + ":" + dk.hex()
 
 
@@ -68,75 +150,246 @@ def verify_password(password: str, stored_hash: str) -> bool:
         return False
     try:
         if stored_hash.startswith("pbkdf2:"):
-            import hashlib as _hl, hmac as _hmac
             _, salt_hex, dk_hex = stored_hash.split(":")
             salt = bytes.fromhex(salt_hex)
             dk_exp = bytes.fromhex(dk_hex)
-            dk_act = _hl.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 600_000)
-            return _hmac.compare_digest(dk_act, dk_exp)
+            dk_act = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 600_000)
+            return hmac.compare_digest(dk_act, dk_exp)
         if BCRYPT_AVAILABLE:
             return bcrypt.checkpw(password.encode("utf-8"), stored_hash.encode("utf-8"))
     except Exception as _e:
         pass  # Error de verificacion — hash invalido o incompatible
     return False
 
+class ProfileStore:
+    """
+    Perfiles guardados, mantenidos en memoria.
+
+    En disco cada perfil se cifra por separado dentro de un índice JSON:
+        {"version": 2, "profiles": {nombre: token}}
+    así load_profile() descifra solo la entrada pedida. Los archivos
+    anteriores (un único blob cifrado) se leen igual y se reescriben en el
+    formato nuevo en el siguiente flush().
+    """
+
+    def __init__(self, path: Path = PROFILES_FILE):
+        self._path = path
+        self._records: Dict[str, Optional[str]] = {}   # nombre → token (None = sin cifrar aún)
+        self._decoded: Dict[str, Dict] = {}            # nombre → perfil ya descifrado
+        self._mtime_ns: Optional[int] = None
+        self._dirty = False
+        self._last_written_hash: Optional[bytes] = None  # blake2b del contenido en disco
+
+    def invalidate(self):
+        """Fuerza releer el archivo en el próximo acceso (descarta cambios sin flush)."""
+        self._records = {}
+        self._decoded = {}
+        self._mtime_ns = None
+        self._dirty = False
+        self._last_written_hash = None
+
+    def _refresh(self):
+        """Relee el índice si PROFILES_FILE cambió en disco."""
+        if self._dirty:
+            return
+        try:
+            mtime = self._path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._records, self._decoded, self._mtime_ns = {}, {}, None
+            self._last_written_hash = None
+            return
+        if mtime == self._mtime_ns:
+            return
+        self._records, self._decoded = {}, {}
+        self._last_written_hash = None
+        try:
+            raw = self._path.read_bytes()
+            self._last_written_hash = _digest(raw)
+            doc = _loads(raw) if raw[:1] == b"{" else None
+            if isinstance(doc, dict) and doc.get("version") == 2:
+                self._records = dict(doc["profiles"])
+            else:
+                # Formato anterior: blob cifrado (o JSON plano sin cryptography)
+                legacy = doc if doc is not None else _loads(_decrypt_bytes(raw))
+                self._decoded = legacy
+                self._records = dict.fromkeys(legacy)
+        except Exception:
+            self._records, self._decoded = {}, {}
+        self._mtime_ns = mtime
+
+    def names(self):
+        self._refresh()
+        return list(self._records)
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Copia del perfil `name` (descifrando solo esa entrada)."""
+        p = self._get(name)
+        return dict(p) if p is not None else None
+
+    def _get(self, name: str) -> Optional[Dict]:
+        """Perfil cacheado en el store; nunca se entrega fuera de la clase."""
+        self._refresh()
+        if name not in self._records:
+            return None
+        p = self._decoded.get(name)
+        if p is None:
+            try:
+                p = _open_record(self._records[name])
+            except RuntimeError:
+                raise       # dependencia faltante: no ocultar el perfil en silencio
+            except Exception:
+                return None
+            self._decoded[name] = p
+        return p
+
+    def load(self) -> Dict:
+        """Copias de todos los perfiles descifrados."""
+        return {name: dict(p) for name in self.names() if (p := self._get(name)) is not None}
+
+    def save_profile(self, name: str, host: str, user: str, password: str,
+                     port: int = 443, conn_type: str = "vcenter", ignore_ssl: bool = True):
+        prev = self._get(name)
+        secret = self._unchanged_secret(prev, password)
+        if secret is None:
+            secret = (encrypt_password(password), hash_password(password))
+        profile = {
+            "host": host,
+            "user": user,
+            "password_enc": secret[0],
+            "password_hash": secret[1],
+            "port": port,
+            "conn_type": conn_type,
+            "ignore_ssl": ignore_ssl,
+        }
+        if profile == prev:
+            return      # re-guardado sin cambios: se conserva el token cifrado
+        self._decoded[name] = profile
+        self._records[name] = None
+        self._dirty = True
+
+    @staticmethod
+    def _unchanged_secret(prev: Optional[Dict], password: str):
+        """
+        (password_enc, password_hash) del perfil previo si la contraseña no
+        cambió; así editar host/puerto no vuelve a pagar bcrypt/PBKDF2.
+        """
+        if not prev or not prev.get("password_hash") or "password_enc" not in prev:
+            return None
+        try:
+            old = decrypt_password(prev["password_enc"])
+        except Exception:
+            return None
+        if hmac.compare_digest(old.encode("utf-8"), password.encode("utf-8")):
+            return prev["password_enc"], prev["password_hash"]
+        return None
+
+    def save_many(self, profiles: Iterable[Dict]):
+        """Agrega varios perfiles (dicts con los argumentos de save_profile) y escribe una vez."""
+        for data in profiles:
+            self.save_profile(**data)
+        self.flush()
+
+    def delete_profile(self, name: str):
+        self._refresh()
+        if name in self._records:
+            del self._records[name]
+            self._decoded.pop(name, None)
+            self._dirty = True
+
+    def flush(self):
+        """Escribe PROFILES_FILE si hay cambios pendientes; solo recifra las entradas tocadas."""
+        if not self._dirty:
+            return
+        for name, token in self._records.items():
+            if token is None:
+                p = self._decoded[name]
+                _migrate_password_enc(p)
+                self._records[name] = _seal_record(p)
+        payload = _dumps({"version": 2, "profiles": self._records})
+        self._dirty = False
+        h = _digest(payload)
+        if h == self._last_written_hash:
+            return
+        ensure_app_dir()
+        self._path.write_bytes(payload)
+        self._mtime_ns = self._path.stat().st_mtime_ns
+        self._last_written_hash = h
+
+def _digest(payload: bytes) -> bytes:
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+# Prefijo de los tokens cuyo contenido es msgpack (sin prefijo = JSON)
+_MSGPACK_PREFIX = "m."
+
+def _seal_record(profile: Dict) -> str:
+    """
+    Token de una entrada: base64(nonce || ct) con AES-GCM, o JSON sin cryptography.
+    Cifrado, el registro se empaqueta con msgpack y password_enc va como
+    bytes crudos, sin la segunda capa de base64.
+    """
+    if CRYPTO_AVAILABLE:
+        rec = dict(profile)
+        enc = rec.get("password_enc")
+        if isinstance(enc, str):
+            rec["password_enc"] = base64.urlsafe_b64decode(enc)
+        data = msgpack.packb(rec, use_bin_type=True)
+        return _MSGPACK_PREFIX + base64.urlsafe_b64encode(_encrypt_bytes(data)).decode()
+    data = _dumps(profile)
+    if not CRYPTO_AVAILABLE:
+        return data.decode("utf-8")
+    return base64.urlsafe_b64encode(_encrypt_bytes(data)).decode()
+
+def _open_record(token: str) -> Dict:
+    if token.startswith(_MSGPACK_PREFIX):
+        if not CRYPTO_AVAILABLE:
+            raise RuntimeError(
+                "Perfil cifrado con AES-GCM/msgpack: instalar cryptography y msgpack "
+                "(ver requirements.txt) para leerlo"
+            )
+        data = _decrypt_bytes(base64.urlsafe_b64decode(token[len(_MSGPACK_PREFIX):]))
+        rec = msgpack.unpackb(data, raw=False)
+        # Fuera del registro sellado password_enc vuelve al str de encrypt_password
+        enc = rec.get("password_enc")
+        if isinstance(enc, bytes):
+            rec["password_enc"] = base64.urlsafe_b64encode(enc).decode()
+        return rec
+    if not CRYPTO_AVAILABLE:
+        return _loads(token.encode("utf-8"))
+    return _loads(_decrypt_bytes(base64.urlsafe_b64decode(token)))
+
+def _migrate_password_enc(profile: Dict):
+    """Recifra en AES-GCM la contraseña si aún es un token Fernet."""
+    enc = profile.get("password_enc", "")
+    if CRYPTO_AVAILABLE and isinstance(enc, str) and _is_fernet_token(enc.encode()):
+        profile["password_enc"] = encrypt_password(decrypt_password(enc))
+
+# Store compartido por las funciones de módulo
+_STORE = ProfileStore()
+
 def save_profile(name: str, host: str, user: str, password: str,
                  port: int = 443, conn_type: str = "vcenter", ignore_ssl: bool = True):
-    ensure_app_dir()
-    profiles = load_all_profiles()
-    profiles[name] = {
-        "host": host,
-        "user": user,
-        "password_enc": encrypt_password(password),
-        "password_hash": hash_password(password),
-        "port": port,
-        "conn_type": conn_type,
-        "ignore_ssl": ignore_ssl,
-    }
-    if CRYPTO_AVAILABLE:
-        f = Fernet(get_or_create_key())
-        data = f.encrypt(json.dumps(profiles).encode())
-        PROFILES_FILE.write_bytes(data)
-    else:
-        PROFILES_FILE.write_text(json.dumps(profiles))
+    _STORE.save_profile(name, host, user, password, port, conn_type, ignore_ssl)
+    _STORE.flush()
 
 def load_all_profiles() -> Dict:
-    if not PROFILES_FILE.exists():
-        return {}
-    try:
-        if CRYPTO_AVAILABLE:
-            f = Fernet(get_or_create_key())
-            data = f.decrypt(PROFILES_FILE.read_bytes())
-            return json.loads(data)
-        else:
-            return json.loads(PROFILES_FILE.read_text())
-    except Exception:
-        return {}
+    return _STORE.load()
 
 def load_profile(name: str) -> Optional[Dict]:
-    profiles = load_all_profiles()
-    p = profiles.get(name)
+    p = _STORE.get(name)
     if p and "password_enc" in p:
-        p = dict(p)
         p["password"] = decrypt_password(p["password_enc"])
     return p
 
 def delete_profile(name: str):
-    profiles = load_all_profiles()
-    profiles.pop(name, None)
-    if CRYPTO_AVAILABLE:
-        f = Fernet(get_or_create_key())
-        data = f.encrypt(json.dumps(profiles).encode())
-        PROFILES_FILE.write_bytes(data)
-    else:
-        PROFILES_FILE.write_text(json.dumps(profiles))
+    _STORE.delete_profile(name)
+    _STORE.flush()
 
 def list_profiles():
-    return list(load_all_profiles().keys())
+    return _STORE.names()
+
+_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
 
 def format_bytes(b: int) -> str:
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if b < 1024:
-            return f"{b:.1f} {unit}"
-        b /= 1024
-    return f"{b:.1f} PB"
+    # Unidad = floor(log2(b) / 10) con exponente entero exacto, acotada a PB
+    i = 0 if b < 1024 else min((int(b).bit_length() - 1) // 10, len(_UNITS) - 1)
+    return f"{b / (1 << (10 * i)):.1f} {_UNITS[i]}"
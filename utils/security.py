@@ -1,31 +1,34 @@
 """
 utils/security.py
-Gestión segura de credenciales con cifrado Fernet.
+Gestión segura de credenciales.
+Interfaz orientada a objetos sobre utils.credentials: usa el mismo
+ProfileStore, por lo que ambos módulos leen y escriben el mismo
+profiles.enc con el mismo formato.
 """
 
-import json
-import base64
-from pathlib import Path
 from typing import Optional
 
-try:
-    from cryptography.fernet import Fernet
-    CRYPTO_AVAILABLE = True
-except ImportError:
-    CRYPTO_AVAILABLE = False
+from .credentials import (
+    CRYPTO_AVAILABLE, PROFILES_FILE, KEY_FILE,
+    ProfileStore, _STORE, get_or_create_key,
+    encrypt_password, decrypt_password,
+)
+from .credentials import hash_password as _hash_password
 
 class CredentialManager:
     """
     Gestiona el almacenamiento seguro de perfiles de conexión.
-    Usa Fernet (AES-128-CBC + HMAC-SHA256) para cifrado local.
+    Delega el cifrado (AES-GCM por entrada) y la persistencia en ProfileStore.
     """
 
-    PROFILES_FILE = Path.home() / ".vmware_inventory" / "profiles.enc"
-    KEY_FILE = Path.home() / ".vmware_inventory" / ".key"
+    PROFILES_FILE = PROFILES_FILE
+    KEY_FILE = KEY_FILE
 
     def __init__(self):
         self._ensure_dir()
         self._key = self._load_or_create_key()
+        # Mismo store que las funciones de utils.credentials: un solo caché por archivo
+        self._store: ProfileStore = _STORE
 
     def _ensure_dir(self):
         self.PROFILES_FILE.parent.mkdir(parents=True, exist_ok=True)
@@ -33,10 +36,7 @@ class CredentialManager:
     def _load_or_create_key(self) -> Optional[bytes]:
         if not CRYPTO_AVAILABLE:
             return None
-        if self.KEY_FILE.exists():
-            return self.KEY_FILE.read_bytes()
-        key = Fernet.generate_key()
-        self.KEY_FILE.write_bytes(key)
+        key = get_or_create_key()
         # Ocultar archivo en Windows
         try:
             import ctypes
@@ -50,87 +50,43 @@ class CredentialManager:
                      conn_type: str = "vcenter") -> bool:
         """Guarda un perfil de conexión cifrado."""
         try:
-            profiles = self.load_profiles()
-            profiles[name] = {
-                "host": host,
-                "user": user,
-                "port": port,
-                "conn_type": conn_type,
-                "password_hash": self._hash_password(password),
-                "password_enc": self._encrypt(password),
-            }
-            self._write_profiles(profiles)
+            self._store.save_profile(name, host, user, password, port, conn_type)
+            self._store.flush()
             return True
         except Exception:
             return False
 
     def load_profile(self, name: str) -> Optional[dict]:
         """Carga un perfil y descifra la contraseña."""
-        profiles = self.load_profiles()
-        if name not in profiles:
+        profile = self._store.get(name)
+        if profile is None:
             return None
-        profile = profiles[name].copy()
         if profile.get("password_enc"):
             profile["password"] = self._decrypt(profile["password_enc"])
         return profile
 
     def load_profiles(self) -> dict:
         """Carga todos los perfiles (sin contraseñas descifradas)."""
-        if not self.PROFILES_FILE.exists():
-            return {}
-        try:
-            data = self.PROFILES_FILE.read_bytes()
-            if CRYPTO_AVAILABLE and self._key:
-                f = Fernet(self._key)
-                decrypted = f.decrypt(data)
-                return json.loads(decrypted.decode())
-            else:
-                return json.loads(data.decode())
-        except Exception:
-            return {}
+        return self._store.load()
 
     def delete_profile(self, name: str) -> bool:
         """Elimina un perfil guardado."""
-        profiles = self.load_profiles()
-        if name in profiles:
-            del profiles[name]
-            self._write_profiles(profiles)
-            return True
-        return False
-
-    def _write_profiles(self, profiles: dict):
-        data = json.dumps(profiles, indent=2).encode()
-        if CRYPTO_AVAILABLE and self._key:
-            f = Fernet(self._key)
-            encrypted = f.encrypt(data)
-            self.PROFILES_FILE.write_bytes(encrypted)
-        else:
-            self.PROFILES_FILE.write_bytes(data)
+        if name not in self._store.names():
+            return False
+        self._store.delete_profile(name)
+        self._store.flush()
+        return True
 
     def _encrypt(self, text: str) -> str:
-        if not CRYPTO_AVAILABLE or not self._key:
-            return base64.b64encode(text.encode()).decode()
-        f = Fernet(self._key)
-        return f.encrypt(text.encode()).decode()
+        return encrypt_password(text)
 
     def _decrypt(self, encrypted: str) -> str:
-        if not CRYPTO_AVAILABLE or not self._key:
-            return base64.b64decode(encrypted.encode()).decode()
-        f = Fernet(self._key)
-        return f.decrypt(encrypted.encode()).decode()
+        return decrypt_password(encrypted)
 
     @staticmethod
     def hash_password(password: str) -> str:
         """
         FIX CodeQL py/weak-sensitive-data-hashing (linea 125):
-        Reemplaza SHA-256 por bcrypt/PBKDF2.
+        Reemplaza SHA-256 por bcrypt/PBKDF2 (ver utils.credentials.hash_password).
         """
-        if BCRYPT_AVAILABLE:
-            return bcrypt.hashpw(
-                password.encode("utf-8"),
-                bcrypt.gensalt(rounds=12),
-            ).decode("utf-8")
-        import hashlib as _hl, os as _os
-        salt = _os.urandom(32)
-        dk = _hl.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 600_000)
-        return "pbkdf2:" + salt.hex() + ":" + dk.hex()
+        return _hash_password(password)